@@ -0,0 +1,52 @@
+import io
+import sys
+import types
+import unittest
+from unittest import mock
+
+from vimdoc import args
+
+
+def _FakeShtab():
+  shtab = types.ModuleType('shtab')
+  shtab.SUPPORTED_SHELLS = ['bash', 'zsh']
+  shtab.DIR = {'bash': '_shtab_compgen_dirs', 'zsh': '_files -/'}
+  shtab.complete = lambda parser, shell: '# {} completion for {}'.format(
+      shell, parser.prog)
+  return shtab
+
+
+class TestPrintCompletion(unittest.TestCase):
+
+  def setUp(self):
+    self.addCleanup(vars(args.plugin_arg).pop, 'complete', None)
+
+  def _Run(self, argv, shtab):
+    """Parses argv with shtab importable as given, returning (exit, out, err)."""
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with mock.patch.dict(sys.modules, {'shtab': shtab}), \
+        mock.patch('sys.stdout', stdout), mock.patch('sys.stderr', stderr):
+      with self.assertRaises(SystemExit) as cm:
+        args.parser.parse_args(argv)
+    return cm.exception.code, stdout.getvalue(), stderr.getvalue()
+
+  def test_prints_completion(self):
+    shtab = _FakeShtab()
+    code, out, _ = self._Run(['--print-completion', 'bash'], shtab)
+    self.assertEqual(0, code)
+    self.assertEqual('# bash completion for vimdoc\n', out)
+    self.assertIs(shtab.DIR, args.plugin_arg.complete)
+
+  def test_unsupported_shell(self):
+    code, out, err = self._Run(['--print-completion', 'fish'], _FakeShtab())
+    self.assertEqual(2, code)
+    self.assertEqual('', out)
+    self.assertIn("invalid choice: 'fish' (choose from bash, zsh)", err)
+
+  def test_missing_shtab(self):
+    # A None entry in sys.modules makes the import raise ImportError.
+    code, out, err = self._Run(['--print-completion', 'bash'], None)
+    self.assertEqual(2, code)
+    self.assertEqual('', out)
+    self.assertIn('pip install vimdoc[completion]', err)
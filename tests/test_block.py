@@ -0,0 +1,17 @@
+import unittest
+
+import vimdoc
+from vimdoc.block import Block
+
+
+class TestBlock(unittest.TestCase):
+
+  def test_names_follow_namespace(self):
+    """Names computed before the namespace is merged in must not go stale."""
+    block = Block(vimdoc.FUNCTION)
+    block.Local(name='Foo', args=[])
+    self.assertEqual('Foo', block.FullName())
+    self.assertEqual('Foo()', block.TagName())
+    block.Local(namespace='myplugin#')
+    self.assertEqual('myplugin#Foo', block.FullName())
+    self.assertEqual('myplugin#Foo()', block.TagName())
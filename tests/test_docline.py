@@ -0,0 +1,33 @@
+import unittest
+
+import vimdoc
+from vimdoc import docline
+from vimdoc.block import Block
+
+
+class TestHeader(unittest.TestCase):
+
+  def _Usage(self, header, typ=vimdoc.FUNCTION, args=None):
+    block = Block(typ)
+    block.Local(name='Foo')
+    if args is not None:
+      block.Local(args=args)
+    block.SetHeader(header)
+    return header.GenerateUsage(block)
+
+  def test_holes(self):
+    header = docline.Function('<>({req}, {]) [opt] {} []')
+    usage = self._Usage(header, args=['other', '...'])
+    self.assertEqual('Foo({req}, {other}) [opt] {other} ', usage)
+
+  def test_hole_escapes(self):
+    header = docline.Function('<>() <|> {|} [|] <||> {||} [||]')
+    self.assertEqual('Foo() <> {} [] <|> {|} [|]', self._Usage(header, args=[]))
+
+  def test_bad_separators(self):
+    header = docline.Command('<> {}  [] {a}  [b]')
+    self.assertEqual(':Foo {a} [b]', self._Usage(header, typ=vimdoc.COMMAND))
+
+  def test_glued_holes(self):
+    header = docline.Command('<> {}[]')
+    self.assertEqual(':Foo ', self._Usage(header, typ=vimdoc.COMMAND, args=[]))
@@ -148,3 +148,39 @@ class TestVimModule(unittest.TestCase):
     main_module.Close()
     self.assertEqual([custom1, intro, commands, custom2, about],
         list(main_module.Chunks()))
+
+  def test_collection_after_merge(self):
+    """Collections and tag lookups should pick up blocks merged later."""
+    plugin = module.VimPlugin('myplugin')
+    main_module = module.Module('myplugin', plugin)
+    first = Block(vimdoc.COMMAND)
+    first.Local(name='First')
+    main_module.Merge(first)
+    self.assertEqual([first], main_module.GetCollection(vimdoc.COMMAND))
+    self.assertEqual(':First', main_module.LookupTag(vimdoc.COMMAND, 'First'))
+    second = Block(vimdoc.COMMAND)
+    second.Local(name='Second')
+    main_module.Merge(second)
+    self.assertEqual(
+        [first, second], main_module.GetCollection(vimdoc.COMMAND))
+    second_dup = Block(vimdoc.COMMAND)
+    second_dup.Local(name='Second')
+    main_module.Merge(second_dup)
+    with self.assertRaises(KeyError):
+      main_module.LookupTag(vimdoc.COMMAND, 'Second')
+
+  def test_duplicate_ordering(self):
+    """Sections listed twice in @order keep their first position."""
+    plugin = module.VimPlugin('myplugin')
+    main_module = module.Module('myplugin', plugin)
+    intro = Block(vimdoc.SECTION)
+    intro.Local(name='Introduction', id='intro')
+    intro.Global(order=['intro', 'about', 'intro'])
+    about = Block(vimdoc.SECTION)
+    about.Local(name='About', id='about')
+    kid = Block(vimdoc.SECTION)
+    kid.Local(name='Kid', id='kid', parent_id='intro')
+    for section in [intro, about, kid]:
+      main_module.Merge(section)
+    main_module.Close()
+    self.assertEqual(['intro', 'kid', 'about'], list(main_module.sections))
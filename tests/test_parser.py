@@ -0,0 +1,21 @@
+import unittest
+
+from vimdoc import codeline
+from vimdoc import parser
+
+
+class TestParseCodeLine(unittest.TestCase):
+
+  def test_command_flags(self):
+    line = parser.ParseCodeLine(
+        'command -bang -range=% -count=3 -nargs=* -complete=custom,s:Foo Bar')
+    self.assertIsInstance(line, codeline.Command)
+    self.assertEqual('Bar', line.name)
+    self.assertEqual(
+        {'bang': True, 'range': True, 'count': True, 'register': False,
+         'buffer': False, 'bar': False},
+        line.flags)
+
+  def test_command_flags_match_whole_attributes(self):
+    line = parser.ParseCodeLine('command -complete=custom,s:-bar Baz')
+    self.assertFalse(line.flags['bar'])
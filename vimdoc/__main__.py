@@ -2,8 +2,6 @@ import os
 import sys
 
 import vimdoc.args
-from vimdoc.module import Modules
-from vimdoc.output import Helpfile
 
 
 def main(argv=None):
@@ -11,6 +9,11 @@ def main(argv=None):
     argv = sys.argv
   args = vimdoc.args.parser.parse_args(argv[1:])
 
+  # Deferred so that --help and --version don't pay for loading the parser.
+  # pylint:disable-msg=g-import-not-at-top
+  from vimdoc.module import Modules
+  from vimdoc.output import Helpfile
+
   docdir = os.path.join(args.plugin, 'doc')
   if not os.path.isdir(docdir):
     os.mkdir(docdir)
@@ -3,11 +3,6 @@ import os
 
 import vimdoc
 
-try:
-  import shtab
-except ImportError:
-  from . import _shtab as shtab
-
 
 def Source(path):
   if not os.path.isdir(path):
@@ -17,6 +12,28 @@ def Source(path):
   return path
 
 
+class PrintCompletion(argparse.Action):
+  """Prints a shell completion script.
+
+  shtab is only imported here, so ordinary runs never pay for loading it.
+  """
+
+  def __call__(self, parser, namespace, values, option_string=None):
+    try:
+      # pylint:disable-msg=g-import-not-at-top
+      import shtab
+    except ImportError:
+      parser.error(
+          '{} requires shtab (pip install vimdoc[completion])'.format(
+              option_string))
+    if values not in shtab.SUPPORTED_SHELLS:
+      parser.error('argument {}: invalid choice: {!r} (choose from {})'.format(
+          option_string, values, ', '.join(shtab.SUPPORTED_SHELLS)))
+    plugin_arg.complete = shtab.DIR
+    print(shtab.complete(parser, values))
+    parser.exit(0)
+
+
 parser = argparse.ArgumentParser(
     'vimdoc',
     formatter_class=argparse.RawTextHelpFormatter,
@@ -26,9 +43,11 @@ Generate vim helpfiles
 Basic usage:
   %(prog)s vim-someplugin/
   (or %(prog)s .)''')
-shtab.add_argument_to(parser)
 parser.add_argument(
+    '--print-completion', action=PrintCompletion, metavar='SHELL',
+    help='print shell completion script (requires shtab)')
+plugin_arg = parser.add_argument(
     'plugin', type=Source, metavar='PLUGIN',
-    help='a vim plugin directory').complete = shtab.DIR
+    help='a vim plugin directory')
 parser.add_argument('--version', action='version',
     version='%(prog)s ' + vimdoc.__version__)
@@ -1,5 +1,4 @@
 """Vimdoc blocks: encapsulated chunks of documentation."""
-from collections import OrderedDict
 import warnings
 
 import vimdoc
@@ -7,6 +6,15 @@ from vimdoc import error
 from vimdoc import paragraph
 from vimdoc import regex
 
+# Block types that may still end up with a usage line. None and True mean the
+# type hasn't been settled yet.
+_ARG_TYPES = (None, True, vimdoc.FUNCTION, vimdoc.COMMAND)
+
+# Patterns used on every documentation line, bound here to skip the module
+# attribute lookup.
+_list_item = regex.list_item
+_required_or_optional_arg = regex.required_or_optional_arg
+
 
 class Block(object):
   """Blocks are encapsulated chunks of documentation.
@@ -24,6 +32,11 @@ class Block(object):
         this one and prevent this block from showing up in the docs.
   """
 
+  __slots__ = (
+      'locals', 'globals', 'header', 'paragraphs',
+      '_required_args', '_optional_args', '_closed', '_is_secondary',
+      '_is_default', '_full_name', '_tag_name')
+
   def __init__(self, type=None, is_secondary=False, is_default=False):
     # May include:
     # deprecated (boolean)
@@ -55,13 +68,17 @@ class Block(object):
     self._closed = False
     self._is_secondary = is_secondary
     self._is_default = is_default
+    # Cached results of FullName() and TagName(). Reset whenever locals change.
+    self._full_name = None
+    self._tag_name = None
 
   def AddLine(self, line):
     """Adds a line of text to the block. Paragraph type is auto-determined."""
     # Code blocks are treated differently:
     # Newlines aren't joined and blanklines aren't special.
     # See :help help-writing for specification.
-    if self.paragraphs.IsType(paragraph.CodeBlock):
+    current = self.paragraphs.Current()
+    if isinstance(current, paragraph.CodeBlock):
       # '<' exits code blocks.
       if line.startswith('<'):
         self.paragraphs.Close()
@@ -70,46 +87,50 @@ class Block(object):
           self.AddLine(line)
         return
       # Lines starting in column 0 exit code lines.
-      if line[:1] not in ' \t':
+      if line and not line.startswith((' ', '\t')):
         self.paragraphs.Close()
         self.AddLine(line)
         return
       self.paragraphs.AddLine(line)
       return
-    # Always grab the required/optional args.
-    self._ParseArgs(line)
     # Blank lines divide paragraphs.
     if not line.strip():
       self.paragraphs.SetType(paragraph.BlankLine)
       return
-    # Start lists if you get a list item.
-    match = regex.list_item.match(line or '')
+    # Always grab the required/optional args.
+    self._ParseArgs(line)
+    # Start lists if you get a list item. Those start with a bullet or a digit,
+    # so other lines needn't be matched.
+    first = line.lstrip()[0]
+    if first in '*+-' or first.isdigit():
+      match = _list_item.match(line)
+    else:
+      match = None
     if match:
       leader = match.group(1)
       self.paragraphs.Close()
-      line = regex.list_item.sub('', line)
-      self.paragraphs.SetType(paragraph.ListItem, leader)
-      self.paragraphs.AddLine(line)
+      line = line[match.end():]
+      self.paragraphs.AddLineAs(paragraph.ListItem, line, leader)
       return
-    if line and line[:1] in ' \t':
+    if line.startswith((' ', '\t')):
       # Continue lists by indenting.
-      if self.paragraphs.IsType(paragraph.ListItem):
+      if isinstance(current, paragraph.ListItem):
         self.paragraphs.AddLine(line.lstrip())
         return
-    elif self.paragraphs.IsType(paragraph.ListItem):
+    elif isinstance(current, paragraph.ListItem):
       self.paragraphs.Close()
-    # Everything else is text.
-    self.paragraphs.SetType(paragraph.TextParagraph)
     # Lines ending in '>' enter code blocks. Must have a space before if it if
     # not on a line by itself.
-    if line == '>' or line.endswith(' >'):
+    if line.endswith('>') and (len(line) == 1 or line[-2] == ' '):
+      # The text paragraph is opened even for a lone '>'.
+      self.paragraphs.SetType(paragraph.TextParagraph)
       line = line[:-1].rstrip()
       if line:
         self.paragraphs.AddLine(line)
       self.paragraphs.SetType(paragraph.CodeBlock)
       return
-    # Normal paragraph handling.
-    self.paragraphs.AddLine(line)
+    # Everything else is text.
+    self.paragraphs.AddLineAs(paragraph.TextParagraph, line)
 
   def Global(self, **kwargs):
     """Sets global metadata, like plugin author."""
@@ -126,9 +147,11 @@ class Block(object):
       if key in self.locals and self.locals[key] != value:
         raise error.InconsistentControl(key, self.locals[key], value)
       self.locals[key] = value
+    self._ForgetNames()
 
   def SetType(self, newtype):
     """Sets the block type (function, command, etc.)."""
+    self._ForgetNames()
     ourtype = self.locals.get('type')
     # 'True' means "I'm definitely vimdoc but I don't have a type yet".
     if newtype is True or newtype == ourtype:
@@ -208,7 +231,7 @@ class Block(object):
         return sigargs
       # The args they did mention are all in the signature. Use the argument
       # order from the function signature.
-      if not set(self._required_args).difference(sigargs):
+      if all(arg in sigargs for arg in self._required_args):
         return sigargs
       # Looks like they're renaming the signature's args. Use the arguments that
       # they named in the order they named them.
@@ -247,6 +270,11 @@ class Block(object):
 
   def FullName(self):
     """The global (namespaced as necessary) name of the code element."""
+    if self._full_name is None:
+      self._full_name = self._FullName()
+    return self._full_name
+
+  def _FullName(self):
     typ = self.locals.get('type')
     if typ == vimdoc.FUNCTION:
       if 'dict' in self.locals:
@@ -259,6 +287,11 @@ class Block(object):
 
   def TagName(self):
     """The tag string to use for links to the code element."""
+    if self._tag_name is None:
+      self._tag_name = self._TagName()
+    return self._tag_name
+
+  def _TagName(self):
     if self._is_secondary:
       return None
     typ = self.locals.get('type')
@@ -274,12 +307,22 @@ class Block(object):
     """Whether this block is a default only as opposed to an explicit block."""
     return self._is_default
 
+  def _ForgetNames(self):
+    self._full_name = None
+    self._tag_name = None
+
   def _ParseArgs(self, args):
-    # Removes duplicates but retains order:
-    self._required_args = list(OrderedDict.fromkeys(
-        self._required_args + regex.required_arg.findall(args)))
-    self._optional_args = list(OrderedDict.fromkeys(
-        self._optional_args + regex.optional_arg.findall(args)))
+    # Only functions and commands have usage lines that need args.
+    if self.locals.get('type') not in _ARG_TYPES:
+      return
+    # Appends new args in order of first mention, skipping duplicates. Both
+    # kinds are found in a single scan, and lines without any cost nothing more.
+    for required, optional in _required_or_optional_arg.findall(args):
+      if required:
+        if required not in self._required_args:
+          self._required_args.append(required)
+      elif optional not in self._optional_args:
+        self._optional_args.append(optional)
 
   def __repr__(self):
     try:
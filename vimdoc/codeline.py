@@ -4,6 +4,14 @@ import abc
 import vimdoc
 import vimdoc.block
 
+# Command flags that show up before the command name in usage lines, in order.
+_HEAD_FLAGS = (
+    ('range', '[range]'),
+    ('count', '[count]'),
+    ('register', '["x]'),
+    ('buffer', '[N]'),
+)
+
 
 class CodeLine(object):
   """A line of code that affects the block above it.
@@ -11,6 +19,9 @@ class CodeLine(object):
   For example, the documentation above a function line will be modified to set
   type=FUNCTION.
   """
+
+  __slots__ = ()
+
   __metaclass__ = abc.ABCMeta
 
   def Update(self, block):
@@ -41,34 +52,42 @@ class CodeLine(object):
     for block in blocks:
       self.Update(block)
       yield block
-    blocks[:] = []
-    selection[:] = []
+    blocks.clear()
+    selection.clear()
 
 
 class Blank(CodeLine):
   """A blank line."""
 
+  __slots__ = ()
+
 
 class EndOfFile(CodeLine):
   """The end of the file."""
 
+  __slots__ = ()
+
 
 class Unrecognized(CodeLine):
   """A code line that doesn't deserve decoration."""
 
+  __slots__ = ('line',)
+
   def __init__(self, line):
     self.line = line
 
   def Affect(self, blocks, selection):
     """Documentation above unrecognized lines is ignored."""
-    blocks[:] = []
-    selection[:] = []
+    blocks.clear()
+    selection.clear()
     return ()
 
 
 class Definition(CodeLine):
   """An abstract definition line."""
 
+  __slots__ = ('name', 'type')
+
   __metaclass__ = abc.ABCMeta
 
   def __init__(self, typ, name):
@@ -83,6 +102,8 @@ class Definition(CodeLine):
 class Function(Definition):
   """Function definition."""
 
+  __slots__ = ('namespace', 'args')
+
   def __init__(self, name, namespace, args):
     self.name = name
     self.namespace = namespace
@@ -100,6 +121,8 @@ class Function(Definition):
 class Command(Definition):
   """Command definition."""
 
+  __slots__ = ('flags',)
+
   def __init__(self, name, **flags):
     self.flags = flags
     super(Command, self).__init__(vimdoc.COMMAND, name)
@@ -109,27 +132,23 @@ class Command(Definition):
     super(Command, self).Update(block)
     # Usage is like:
     # [range][count]["x][N]MyCommand[!] {req1} {req2} [optional1] [optional2]
-    head = ''
-    if self.flags.get('range'):
-      head += '[range]'
-    if self.flags.get('count'):
-      head += '[count]'
-    if self.flags.get('register'):
-      head += '["x]'
-    if self.flags.get('buffer'):
-      head += '[N]'
-    head += '<>'
-    if self.flags.get('bang'):
+    flags = self.flags
+    head = ''.join(text for key, text in _HEAD_FLAGS if flags.get(key)) + '<>'
+    if flags.get('bang'):
       head += '[!]'
     block.Local(head=head)
 
 
 class Setting(Definition):
+  __slots__ = ()
+
   def __init__(self, name):
     super(Setting, self).__init__(vimdoc.SETTING, name)
 
 
 class Flag(Definition):
+  __slots__ = ('_default',)
+
   def __init__(self, name, default):
     super(Flag, self).__init__(vimdoc.FLAG, name)
     self._default = default
@@ -1,5 +1,6 @@
 """Vimfile documentation lines, the stuff of vimdoc blocks."""
 import abc
+import functools
 
 import vimdoc
 from vimdoc import error
@@ -7,9 +8,18 @@ from vimdoc import regex
 from vimdoc.block import Block
 
 
+@functools.lru_cache(maxsize=256)
+def _UsageArgs(usage):
+  """Returns the (required, optional) args named in a usage line."""
+  return (tuple(regex.required_arg.findall(usage)),
+          tuple(regex.optional_arg.findall(usage)))
+
+
 class DocLine(object):
   """One line of vim documentation."""
 
+  __slots__ = ()
+
   __metaclass__ = abc.ABCMeta
 
   def Each(self, blocks, selection):
@@ -42,6 +52,8 @@ class DocLine(object):
 
 
 class Text(DocLine):
+  __slots__ = ('line',)
+
   def __init__(self, line):
     self.line = line
 
@@ -52,6 +64,8 @@ class Text(DocLine):
 class BlockDirective(DocLine):
   """A line-spanning directive, like @usage."""
 
+  __slots__ = ()
+
   __metaclass__ = abc.ABCMeta
 
   REGEX = regex.no_args
@@ -67,6 +81,8 @@ class BlockDirective(DocLine):
 
 
 class All(BlockDirective):
+  __slots__ = ()
+
   REGEX = regex.no_args
 
   def Assign(self):
@@ -83,6 +99,8 @@ class All(BlockDirective):
 
 
 class Author(BlockDirective):
+  __slots__ = ('author',)
+
   REGEX = regex.any_args
 
   def Assign(self, author):
@@ -93,6 +111,8 @@ class Author(BlockDirective):
 
 
 class Backmatter(BlockDirective):
+  __slots__ = ('id',)
+
   REGEX = regex.backmatter_args
 
   def Assign(self, ident):
@@ -104,6 +124,8 @@ class Backmatter(BlockDirective):
 
 
 class Default(BlockDirective):
+  __slots__ = ('arg', 'value')
+
   REGEX = regex.default_args
 
   def Assign(self, arg, value):
@@ -115,6 +137,8 @@ class Default(BlockDirective):
 
 
 class Deprecated(BlockDirective):
+  __slots__ = ('reason',)
+
   REGEX = regex.one_arg
 
   def Assign(self, reason):
@@ -126,6 +150,8 @@ class Deprecated(BlockDirective):
 
 # pylint: disable=g-bad-name
 class Exception_(BlockDirective):
+  __slots__ = ('word',)
+
   REGEX = regex.maybe_word
 
   def Assign(self, word):
@@ -136,6 +162,8 @@ class Exception_(BlockDirective):
 
 
 class Dict(BlockDirective):
+  __slots__ = ('name', 'attribute')
+
   REGEX = regex.dict_args
 
   def Assign(self, name, attribute=None):
@@ -153,11 +181,15 @@ class Dict(BlockDirective):
 
 
 class Library(BlockDirective):
+  __slots__ = ()
+
   def Update(self, block):
     block.Global(library=True)
 
 
 class Order(BlockDirective):
+  __slots__ = ('order',)
+
   REGEX = regex.order_args
 
   def Assign(self, args):
@@ -168,16 +200,22 @@ class Order(BlockDirective):
 
 
 class Private(BlockDirective):
+  __slots__ = ()
+
   def Update(self, block):
     block.Local(private=True)
 
 
 class Public(BlockDirective):
+  __slots__ = ()
+
   def Update(self, block):
     block.Local(private=False)
 
 
 class Section(BlockDirective):
+  __slots__ = ('name', 'id')
+
   REGEX = regex.section_args
 
   def __init__(self, args):
@@ -197,6 +235,8 @@ class Section(BlockDirective):
 
 
 class ParentSection(BlockDirective):
+  __slots__ = ('name',)
+
   REGEX = regex.parent_section_args
 
   def Assign(self, name):
@@ -207,6 +247,8 @@ class ParentSection(BlockDirective):
 
 
 class Setting(BlockDirective):
+  __slots__ = ('name',)
+
   REGEX = regex.one_arg
 
   def Assign(self, name):
@@ -222,11 +264,15 @@ class Setting(BlockDirective):
 
 
 class Standalone(BlockDirective):
+  __slots__ = ()
+
   def Update(self, block):
     block.Global(standalone=True)
 
 
 class Stylized(BlockDirective):
+  __slots__ = ('stylization',)
+
   REGEX = regex.stylizing_args
 
   def Assign(self, stylization):
@@ -237,6 +283,8 @@ class Stylized(BlockDirective):
 
 
 class SubSection(BlockDirective):
+  __slots__ = ('name',)
+
   REGEX = regex.any_args
 
   def Assign(self, name):
@@ -247,6 +295,8 @@ class SubSection(BlockDirective):
 
 
 class Tagline(BlockDirective):
+  __slots__ = ('tagline',)
+
   REGEX = regex.any_args
 
   def Assign(self, tagline):
@@ -257,6 +307,8 @@ class Tagline(BlockDirective):
 
 
 class Throws(BlockDirective):
+  __slots__ = ('error', 'description')
+
   REGEX = regex.throw_args
 
   def Assign(self, typ, description):
@@ -272,6 +324,8 @@ class Throws(BlockDirective):
 class Header(BlockDirective):
   """A header directive, like @usage @function or @command."""
 
+  __slots__ = ('usage', 'reqs', 'opts')
+
   __metaclass__ = abc.ABCMeta
 
   def Affect(self, blocks, selection):
@@ -309,8 +363,7 @@ class Header(BlockDirective):
 
   def Assign(self, usage):
     self.usage = usage
-    self.reqs = regex.required_arg.findall(usage)
-    self.opts = regex.optional_arg.findall(usage)
+    self.reqs, self.opts = _UsageArgs(usage)
 
   def Update(self, block):
     pass
@@ -341,21 +394,27 @@ class Header(BlockDirective):
     # Expand the argument holes.
     # Presumably, the user won't use both the arg hole and the required/optional
     # holes. If they do, then we'll dutifully replicate the args.
+    # These take a pass each: an empty expansion can leave the next hole
+    # delimited, as in '{}[]', and then that one is expanded too.
     usage = regex.arg_hole.sub(extra_args, self.usage)
     usage = regex.required_hole.sub(extra_reqs, usage)
     usage = regex.optional_hole.sub(extra_opts, usage)
-    # Remove bad separators.
-    usage = regex.bad_separator.sub('', usage)
-    # Expand the name holes.
-    usage = regex.name_hole.sub(name, usage)
-    # Expand the hole escape sequences.
-    usage = regex.namehole_escape.sub(r'<\1>', usage)
-    usage = regex.requiredhole_escape.sub(r'{\1}', usage)
-    usage = regex.optionalhole_escape.sub(r'[\1]', usage)
-    return usage
+    # Remove bad separators. They can only be there if a separator got doubled.
+    if ', , ' in usage or '  ' in usage:
+      usage = regex.bad_separator.sub('', usage)
+    def Expander(match):
+      if match.lastindex == 1:
+        return name
+      # Hole escape sequences lose their first '|'.
+      escape = match.group(0)
+      return escape[0] + escape[2:]
+    # Expand the name holes and the hole escapes in one pass.
+    return regex.usage_hole.sub(Expander, usage)
 
 
 class Command(Header):
+  __slots__ = ()
+
   REGEX = regex.any_args
 
   def Update(self, block):
@@ -363,6 +422,8 @@ class Command(Header):
 
 
 class Function(Header):
+  __slots__ = ()
+
   REGEX = regex.any_args
 
   def Update(self, block):
@@ -370,12 +431,15 @@ class Function(Header):
 
 
 class Usage(Header):
+  __slots__ = ()
+
   REGEX = regex.usage_args
 
   def GenerateUsage(self, block):
     """Generates the usage line. Syntax depends upon the block type."""
-    normalize = lambda arg: arg if arg[0] in '[{' else ('{%s}' % arg)
-    args = [normalize(arg) for arg in regex.usage_arg.findall(self.usage)]
+    # Bare names are required args; bracketed ones are used as they are.
+    args = [arg if arg[0] in '[{' else ('{%s}' % arg)
+            for arg in regex.usage_arg.findall(self.usage)]
     if block.locals.get('type') == vimdoc.FUNCTION:
       # Functions are like MyFunction({req1}, {req2}, [opt1])
       self.usage = '<>(%s)' % ', '.join(args)
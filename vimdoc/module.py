@@ -1,5 +1,7 @@
 """Vimdoc plugin management."""
+from collections import defaultdict
 from collections import OrderedDict
+import functools
 import io
 import json
 import os
@@ -23,17 +25,51 @@ DOC_SUBDIRS = [
     'spell',
     'colors',
 ]
+# Subdirectories to crawl inside after/ and at the top of the plugin.
+_AFTER_DIRS = frozenset(DOC_SUBDIRS)
+_TOP_LEVEL_DIRS = frozenset(DOC_SUBDIRS + ['after'])
+
+# Sections created for documented types, as (types, id, name).
+DEFAULT_SECTIONS = (
+    ((vimdoc.FUNCTION,), 'functions', 'Functions'),
+    ((vimdoc.EXCEPTION,), 'exceptions', 'Exceptions'),
+    ((vimdoc.COMMAND,), 'commands', 'Commands'),
+    ((vimdoc.DICTIONARY,), 'dicts', 'Dictionaries'),
+    ((vimdoc.FLAG, vimdoc.SETTING), 'config', 'Configuration'),
+)
+
+# Block types that carry plugin-wide metadata.
+_METADATA_TYPES = (vimdoc.SECTION, vimdoc.BACKMATTER)
+
+# Order of built-in sections when not ordered explicitly.
+DEFAULT_SECTION_ORDER = (
+    'intro',
+    'config',
+    'commands',
+    'autocmds',
+    'settings',
+    'dicts',
+    'functions',
+    'exceptions',
+    'mappings',
+)
 
 
 class Module(object):
   """Manages a set of source files that all output to the same help file."""
 
+  __slots__ = (
+      'name', 'plugin', 'sections', 'backmatters', 'collections',
+      '_collection_cache', 'order')
+
   def __init__(self, name, plugin):
     self.name = name
     self.plugin = plugin
     self.sections = OrderedDict()
     self.backmatters = {}
-    self.collections = {}
+    self.collections = defaultdict(list)
+    # Sorted and filtered collections from GetCollection, by type.
+    self._collection_cache = {}
     self.order = None
 
   def Merge(self, block, namespace=None):
@@ -75,7 +111,8 @@ class Module(object):
     else:
       collection_type = self.plugin.GetCollectionType(block)
       if collection_type is not None:
-        self.collections.setdefault(collection_type, []).append(block)
+        self.collections[collection_type].append(block)
+        self._collection_cache.pop(collection_type, None)
 
   def LookupTag(self, typ, name):
     return self.plugin.LookupTag(typ, name)
@@ -94,6 +131,11 @@ class Module(object):
     Args:
       typ: a vimdoc block type identifier (e.g., vimdoc.FUNCTION)
     """
+    if typ not in self._collection_cache:
+      self._collection_cache[typ] = self._BuildCollection(typ)
+    return self._collection_cache[typ]
+
+  def _BuildCollection(self, typ):
     collection = self.collections.get(typ, ())
     if typ == vimdoc.FUNCTION:
       # Sort by namespace, but preserve order within the same namespace. This
@@ -102,17 +144,18 @@ class Module(object):
       collection = sorted(collection,
           key=lambda x: x.locals.get('namespace', ''))
     elif typ == vimdoc.DICTIONARY:
-      collection = sorted(collection)
-    non_default_names = set(x.TagName() for x in collection
-        if not x.IsDefault())
-    return [x for x in collection
-        if not x.IsDefault() or x.TagName() not in non_default_names]
+      collection = sorted(collection, key=lambda x: x.FullName())
+    tagged = [(x, x.TagName(), x.IsDefault()) for x in collection]
+    non_default_names = set(tag for _, tag, is_default in tagged
+        if not is_default)
+    return [x for x, tag, is_default in tagged
+        if not is_default or tag not in non_default_names]
 
   def _AddMaktabaFlagHelp(self):
     """If any maktaba flags were documented, add a default configuration section
      to explain how to use them.
     """
-    if self.GetCollection(vimdoc.FLAG):
+    if self.collections.get(vimdoc.FLAG):
       block = Block(vimdoc.SECTION, is_default=True)
       block.Local(id='config', name='Configuration')
       block.AddLine(
@@ -126,24 +169,21 @@ class Module(object):
 
     All default sections that have not been overridden will be created.
     """
+    # Nothing was documented, so there are no sections to create or order.
+    if not (self.collections or self.sections or self.backmatters):
+      return
+
     # ----------------------------------------------------------
     # Add default sections.
 
-    # type : (id, name)
-    default_sections = [
-        (vimdoc.FUNCTION, 'functions', 'Functions'),
-        (vimdoc.EXCEPTION, 'exceptions', 'Exceptions'),
-        (vimdoc.COMMAND, 'commands', 'Commands'),
-        (vimdoc.DICTIONARY, 'dicts', 'Dictionaries'),
-        (vimdoc.FLAG, 'config', 'Configuration'),
-        (vimdoc.SETTING, 'config', 'Configuration'),
-      ]
-
-    for (typ, id, name) in default_sections:
-      if typ == vimdoc.FLAG:
+    for (types, id, name) in DEFAULT_SECTIONS:
+      if vimdoc.FLAG in types:
         self._AddMaktabaFlagHelp()
 
-      if self.GetCollection(typ) and (id not in self.sections):
+      # Filtering out default blocks never empties a collection, so there's no
+      # need to sort and filter just to see whether the section is needed.
+      if id not in self.sections and any(
+          self.collections.get(typ) for typ in types):
         # Create the section if it does not exist.
         block = Block(vimdoc.SECTION)
         block.Local(id=id, name=name)
@@ -165,9 +205,8 @@ class Module(object):
     self.order = self._GetSectionOrder(self.order, self.sections)
 
     # Child section collection
-    to_delete = []
-    for key in self.sections:
-      section = self.sections[key]
+    top_level = OrderedDict()
+    for key, section in self.sections.items():
       parent_id = section.locals.get('parent_id', None)
       if parent_id:
         if parent_id not in self.sections:
@@ -175,44 +214,54 @@ class Module(object):
                   section.locals['name'], parent_id)
         parent = self.sections[parent_id]
         parent.locals.setdefault('children', []).append(section)
-        to_delete.append(key)
-
-    for key in to_delete:
-      self.sections.pop(key)
+      else:
+        top_level[key] = section
 
     # Check that all top-level sections are included in ordering.
-    known = set(self.sections)
-    neglected = sorted(known.difference(self.order))
+    ordered_ids = set(self.order)
+    neglected = sorted(key for key in top_level if key not in ordered_ids)
     if neglected:
       raise error.NeglectedSections(neglected, self.order)
 
-    # Reinsert top-level sections in the correct order, expanding the tree of
-    # child sections along the way so we have a linear list of sections to pass
-    # to the output functions.
-
-    # Helper function to recursively add children to self.sections.
-    # We add a 'level' variable to locals so that WriteTableOfContents can keep
-    # track of the nesting.
-    def _AddChildSections(section):
+    # Rebuild the section list with top-level sections in the correct order,
+    # expanding the tree of child sections along the way so we have a linear
+    # list of sections to pass to the output functions.
+    ordered = OrderedDict()
+
+    # Helper function to add a section and its descendants to the ordered
+    # sections, depth first, with siblings sorted by name. We add a 'level'
+    # variable to locals so that WriteTableOfContents can keep track of the
+    # nesting.
+    sort_key = lambda s: s.locals['name']
+    def _AddSectionTree(section):
       section.locals.setdefault('level', 0)
-      if 'children' in section.locals:
-        sort_key = lambda s: s.locals['name']
-        for child in sorted(section.locals['children'], key=sort_key):
-          child.locals['level'] = section.locals['level'] + 1
-          self.sections[child.locals['id']] = child
-          _AddChildSections(child)
+      stack = [section]
+      while stack:
+        section = stack.pop()
+        ordered[section.locals['id']] = section
+        children = section.locals.get('children')
+        if children:
+          children.sort(key=sort_key)
+          for child in children:
+            child.locals['level'] = section.locals['level'] + 1
+          stack.extend(reversed(children))
 
     # Insert sections according to the @order directive
     for key in self.order:
-      if key in self.sections:
-        section = self.sections.pop(key)
-        if 'parent_id' in section.locals and section.locals['parent_id']:
-          raise error.OrderedChildSections(section.locals['id'], self.order)
-        # Move to end.
-        self.sections[key] = section
-        _AddChildSections(section)
+      if key in top_level:
+        _AddSectionTree(top_level[key])
+      elif key in ordered:
+        # A child section was already placed along with its parent. Children
+        # ordered before their parents are skipped.
+        raise error.OrderedChildSections(key, self.order)
+    self.sections = ordered
 
   def Chunks(self):
+    # Dictionary functions, listed under their dictionary by name.
+    dict_funcs = {}
+    for func in self.GetCollection(vimdoc.FUNCTION):
+      if 'dict' in func.locals:
+        dict_funcs.setdefault(func.locals['dict'], []).append(func)
     for ident, section in self.sections.items():
       yield section
       if ident == 'functions':
@@ -225,9 +274,8 @@ class Module(object):
       if ident == 'dicts':
         for block in self.GetCollection(vimdoc.DICTIONARY):
           yield block
-          for func in self.GetCollection(vimdoc.FUNCTION):
-            if func.locals.get('dict') == block.locals['dict']:
-              yield func
+          for func in dict_funcs.get(block.locals['dict'], ()):
+            yield func
       if ident == 'exceptions':
         for block in self.GetCollection(vimdoc.EXCEPTION):
           yield block
@@ -252,21 +300,11 @@ class Module(object):
     "intro" after other sections.
     """
     order = explicit_order or []
-    default_order = [
-      'intro',
-      'config',
-      'commands',
-      'autocmds',
-      'settings',
-      'dicts',
-      'functions',
-      'exceptions',
-      'mappings']
     # Add any undeclared sections before custom sections, except 'about' which
     # comes at the end by default.
     section_insertion_idx = 0
     order = order[:]
-    for builtin in default_order:
+    for builtin in DEFAULT_SECTION_ORDER:
       if builtin in order:
         # Section already present. Skip and continue later sections after it.
         section_insertion_idx = order.index(builtin) + 1
@@ -283,16 +321,25 @@ class Module(object):
 class VimPlugin(object):
   """State for entire plugin (potentially multiple modules)."""
 
+  __slots__ = (
+      'name', 'collections', '_fullname_index', 'tagline', 'author',
+      'stylization', 'library')
+
   def __init__(self, name):
     self.name = name
-    self.collections = {}
+    self.collections = defaultdict(list)
+    # Blocks in each collection keyed by full name, built by LookupTag.
+    self._fullname_index = {}
     self.tagline = None
     self.author = None
     self.stylization = None
     self.library = None
 
   def ConsumeMetadata(self, block):
-    assert block.locals.get('type') in [vimdoc.SECTION, vimdoc.BACKMATTER]
+    assert block.locals.get('type') in _METADATA_TYPES
+    # Most sections set no plugin metadata at all.
+    if not block.globals:
+      return
     # Error out for deprecated controls.
     if 'author' in block.globals:
       raise error.InvalidBlock(
@@ -302,7 +349,7 @@ class VimPlugin(object):
       raise error.InvalidBlock(
           'Invalid directive @tagline.'
           ' Specify description field in addon-info.json instead.')
-    for control in ['stylization', 'library']:
+    for control in ('stylization', 'library'):
       if control in block.globals:
         if getattr(self, control) is not None:
           raise error.RedundantControl(control)
@@ -318,47 +365,58 @@ class VimPlugin(object):
       fullname = scope_match and name or 'g:' + name
     else:
       fullname = name
-    block = None
     if typ in self.collections:
-      collection = self.collections[typ]
-      candidates = [x for x in collection if x.FullName() == fullname]
+      candidates = self._GetFullNameIndex(typ).get(fullname, ())
       if len(candidates) > 1:
         raise KeyError('Found multiple %ss named %s' % (typ, name))
       if candidates:
-        block = candidates[0]
-    if block is None:
-      # Create a dummy block to get default tag.
-      block = Block(typ)
-      block.Local(name=fullname)
-    return block.TagName()
+        return candidates[0].TagName()
+    return _DefaultTagName(typ, fullname)
+
+  def _GetFullNameIndex(self, typ):
+    index = self._fullname_index.get(typ)
+    if index is None:
+      index = {}
+      for block in self.collections[typ]:
+        index.setdefault(block.FullName(), []).append(block)
+      self._fullname_index[typ] = index
+    return index
 
   def GetCollectionType(self, block):
-    typ = block.locals.get('type')
+    blocklocals = block.locals
+    typ = blocklocals.get('type')
 
     # The inclusion of function docs depends upon the module type.
     if typ == vimdoc.FUNCTION:
       # Exclude deprecated functions
-      if block.locals.get('deprecated'):
-        return None
-      # If this is a library module, exclude private functions.
-      if self.library and block.locals.get('private'):
+      if blocklocals.get('deprecated'):
         return None
-      # If this is a non-library, exclude non-explicitly-public functions.
-      if not self.library and block.locals.get('private', True):
+      # If this is a library module, exclude private functions. If this is a
+      # non-library, exclude non-explicitly-public functions.
+      if blocklocals.get('private', not self.library):
         return None
-      if 'exception' in block.locals:
+      if 'exception' in blocklocals:
         return vimdoc.EXCEPTION
 
     return typ
 
   def Merge(self, block):
     typ = block.locals.get('type')
-    if typ in [vimdoc.SECTION, vimdoc.BACKMATTER]:
+    if typ in _METADATA_TYPES:
       self.ConsumeMetadata(block)
     else:
       collection_type = self.GetCollectionType(block)
       if collection_type is not None:
-        self.collections.setdefault(collection_type, []).append(block)
+        self.collections[collection_type].append(block)
+        self._fullname_index.pop(collection_type, None)
+
+
+@functools.lru_cache(maxsize=None)
+def _DefaultTagName(typ, fullname):
+  """Gets the tag for an undocumented element, using a dummy block."""
+  block = Block(typ)
+  block.Local(name=fullname)
+  return block.TagName()
 
 
 def Modules(directory):
@@ -379,7 +437,7 @@ def Modules(directory):
   if os.path.isfile(addon_info_path):
     try:
       with io.open(addon_info_path, 'r', encoding='utf-8') as addon_info_file:
-        addon_info = json.loads(addon_info_file.read())
+        addon_info = json.load(addon_info_file)
     except (IOError, ValueError) as e:
       warnings.warn(
           'Failed to read file {}. Error was: {}'.format(addon_info_path, e),
@@ -387,8 +445,10 @@ def Modules(directory):
   plugin_name = None
   # Use plugin name from addon-info.json if available. Fall back to dir name.
   addon_info = addon_info or {}
-  plugin_name = addon_info.get(
-      'name', os.path.basename(os.path.abspath(directory)))
+  if 'name' in addon_info:
+    plugin_name = addon_info['name']
+  else:
+    plugin_name = os.path.basename(os.path.abspath(directory))
   plugin = VimPlugin(plugin_name)
 
   # Set module metadata from addon-info.json.
@@ -403,6 +463,13 @@ def Modules(directory):
   paths_and_blocks = []
   standalone_paths = []
   autoloaddir = os.path.join(directory, 'autoload')
+  afterdir = os.path.join(directory, 'after')
+  autoload_prefix = 'autoload' + os.path.sep
+  after_prefix = 'after' + os.path.sep
+  # Flag files define their flags explicitly.
+  flag_files = (
+      os.path.join('plugin', 'flags.vim'),
+      os.path.join('instant', 'flags.vim'))
   for (root, dirs, files) in os.walk(directory):
     # Visit files in a stable order, since the ordering of e.g. the Maktaba
     # flags below depends upon the order that we visit the files.
@@ -411,13 +478,14 @@ def Modules(directory):
 
     # Prune non-standard top-level dirs like 'test'.
     if root == directory:
-      dirs[:] = [x for x in dirs if x in DOC_SUBDIRS + ['after']]
-    if root == os.path.join(directory, 'after'):
-      dirs[:] = [x for x in dirs if x in DOC_SUBDIRS]
+      dirs[:] = [x for x in dirs if x in _TOP_LEVEL_DIRS]
+    if root == afterdir:
+      dirs[:] = [x for x in dirs if x in _AFTER_DIRS]
     for f in files:
-      filename = os.path.join(root, f)
-      if os.path.splitext(filename)[1] == '.vim':
-        relative_path = os.path.relpath(filename, directory)
+      if os.path.splitext(f)[1] == '.vim':
+        filename = os.path.join(root, f)
+        # os.walk yields paths under directory, so just strip it off.
+        relative_path = filename[len(directory) + 1:]
         with io.open(filename, encoding='utf-8') as filehandle:
           lines = list(filehandle)
           blocks = list(parser.ParseBlocks(lines, filename))
@@ -425,13 +493,12 @@ def Modules(directory):
           # maktaba#plugin#Enter. These flags have to be special-cased here
           # because there aren't necessarily associated doc comment blocks and
           # the name is computed from the file name.
-          if (not relative_path.startswith('autoload' + os.path.sep)
-              and relative_path != os.path.join('plugin', 'flags.vim')
-              and relative_path != os.path.join('instant', 'flags.vim')):
+          if (not relative_path.startswith(autoload_prefix)
+              and relative_path not in flag_files):
             if ContainsMaktabaPluginEnterCall(lines):
               flagpath = relative_path
-              if flagpath.startswith('after' + os.path.sep):
-                flagpath = os.path.relpath(flagpath, 'after')
+              if flagpath.startswith(after_prefix):
+                flagpath = flagpath[len(after_prefix):]
               flagblock = Block(vimdoc.FLAG, is_default=True)
               name_parts = os.path.splitext(flagpath)[0].split(os.path.sep)
               flagname = name_parts.pop(0)
@@ -456,10 +523,15 @@ def Modules(directory):
 
   modules = []
 
+  # Match each path against the standalone paths once for both passes below.
+  paths_and_blocks = [
+      (path, blocks, GetMatchingStandalonePath(path, standalone_paths))
+      for (path, blocks) in paths_and_blocks]
+
   main_module = Module(plugin_name, plugin)
-  for (path, blocks) in paths_and_blocks:
+  for (path, blocks, standalone_path) in paths_and_blocks:
     # Skip standalone paths.
-    if GetMatchingStandalonePath(path, standalone_paths) is not None:
+    if standalone_path is not None:
       continue
     namespace = None
     if path.startswith('autoload' + os.path.sep):
@@ -470,8 +542,7 @@ def Modules(directory):
 
   # Process standalone modules.
   standalone_modules = {}
-  for (path, blocks) in paths_and_blocks:
-    standalone_path = GetMatchingStandalonePath(path, standalone_paths)
+  for (path, blocks, standalone_path) in paths_and_blocks:
     # Skip all but standalone paths.
     if standalone_path is None:
       continue
@@ -512,6 +583,12 @@ def ContainsMaktabaPluginEnterCall(lines):
   Args:
     lines: A sequence of vimscript strings to search.
   """
+  # Most files never mention the call at all. That's only conclusive if no
+  # line continuations could be splitting the call across lines.
+  text = ''.join(lines)
+  if ('maktaba#plugin#Enter(' not in text
+      and not regex.any_line_continuation.search(text)):
+    return False
   for _, line in parser.EnumerateStripNewlinesAndJoinContinuations(lines):
     if not parser.IsComment(line) and 'maktaba#plugin#Enter(' in line:
       return True
@@ -18,6 +18,10 @@ class Helpfile(object):
   def __init__(self, module, docdir):
     self.module = module
     self.docdir = docdir
+    # TextWrappers by (initial_indent, subsequent_indent).
+    self._wrappers = {}
+    # Output collected by Print while writing, as strings to concatenate.
+    self._output = None
 
   def Filename(self):
     help_filename = self.module.name.replace('#', '-')
@@ -25,14 +29,19 @@ class Helpfile(object):
 
   def Write(self):
     filename = os.path.join(self.docdir, self.Filename())
-    # Output POSIX line endings for portable output that can be published.
-    # They are displayed properly in vim on all platforms.
-    with io.open(filename, 'w', encoding='utf-8', newline='\n') as self.file:
+    self._output = []
+    try:
       self.WriteHeader()
       self.WriteTableOfContents()
       for chunk in self.module.Chunks():
         self.WriteChunk(chunk)
       self.WriteFooter()
+      # Output POSIX line endings for portable output that can be published.
+      # They are displayed properly in vim on all platforms.
+      with io.open(filename, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(''.join(self._output))
+    finally:
+      self._output = None
 
   def WriteHeader(self):
     """Writes a plugin header."""
@@ -144,48 +153,65 @@ class Helpfile(object):
 
   def WriteParagraph(self, p, namespace, indent=0):
     """Writes one paragraph."""
-    if isinstance(p, paragraph.ListItem):
-      # - indents lines after the first
-      if p.leader == '-':
-        leader = ''
-      # + indents the whole paragraph
-      elif p.leader == '+':
-        leader = '  '
-      # Other leaders (*, 1., etc.) are copied verbatim, indented by one
-      # shiftwidth.
-      else:
-        leader = p.leader + ' '
-        indent += 1
-      self.WriteLine(self.Expand(
-          p.text, namespace), indent=indent, leader=leader)
-    elif isinstance(p, paragraph.TextParagraph):
-      self.WriteLine(self.Expand(p.text, namespace), indent=indent)
-    elif isinstance(p, paragraph.BlankLine):
-      self.WriteLine()
-    elif isinstance(p, paragraph.CodeBlock):
-      self.WriteLine('>')
-      for line in p.lines:
-        self.WriteCodeLine(line, namespace, indent=indent)
-      self.WriteLine('<')
-    elif isinstance(p, paragraph.DefaultLine):
-      self.WriteLine(self.Default(
-          p.arg, p.value, namespace), indent=indent)
-    elif isinstance(p, paragraph.ExceptionLine):
-      self.WriteLine(self.Throws(
-          p.exception, p.description, namespace), indent=indent)
-    elif isinstance(p, paragraph.SubHeaderLine):
-      self.WriteLine(p.name.upper(), indent=indent)
-    else:
+    writer = self._PARAGRAPH_WRITERS.get(type(p))
+    if writer is None:
       raise ValueError('What kind of paragraph is {}?'.format(p))
+    writer(self, p, namespace, indent)
+
+  def _WriteListItem(self, p, namespace, indent):
+    # - indents lines after the first
+    if p.leader == '-':
+      leader = ''
+    # + indents the whole paragraph
+    elif p.leader == '+':
+      leader = '  '
+    # Other leaders (*, 1., etc.) are copied verbatim, indented by one
+    # shiftwidth.
+    else:
+      leader = p.leader + ' '
+      indent += 1
+    self.WriteLine(self.Expand(
+        p.text, namespace), indent=indent, leader=leader)
+
+  def _WriteTextParagraph(self, p, namespace, indent):
+    self.WriteLine(self.Expand(p.text, namespace), indent=indent)
+
+  def _WriteBlankLine(self, p, namespace, indent):
+    self.WriteLine()
+
+  def _WriteCodeBlock(self, p, namespace, indent):
+    self.WriteLine('>')
+    for line in p.lines:
+      self.WriteCodeLine(line, namespace, indent=indent)
+    self.WriteLine('<')
+
+  def _WriteDefaultLine(self, p, namespace, indent):
+    self.WriteLine(self.Default(
+        p.arg, p.value, namespace), indent=indent)
+
+  def _WriteExceptionLine(self, p, namespace, indent):
+    self.WriteLine(self.Throws(
+        p.exception, p.description, namespace), indent=indent)
+
+  def _WriteSubHeaderLine(self, p, namespace, indent):
+    self.WriteLine(p.name.upper(), indent=indent)
+
+  # Paragraph type to the method that writes it. Keyed on the exact type, since
+  # ListItem is a TextParagraph that's written differently.
+  _PARAGRAPH_WRITERS = {
+      paragraph.ListItem: _WriteListItem,
+      paragraph.TextParagraph: _WriteTextParagraph,
+      paragraph.BlankLine: _WriteBlankLine,
+      paragraph.CodeBlock: _WriteCodeBlock,
+      paragraph.DefaultLine: _WriteDefaultLine,
+      paragraph.ExceptionLine: _WriteExceptionLine,
+      paragraph.SubHeaderLine: _WriteSubHeaderLine,
+  }
 
   def WriteCodeLine(self, text, namespace, indent=0):
     """Writes one line of code."""
-    wrapper = textwrap.TextWrapper(
-        width=self.WIDTH,
-        initial_indent=(indent * self.TAB),
-        subsequent_indent=((indent + 2) * self.TAB))
-    # wrap returns empty list for ''. See http://bugs.python.org/issue15510.
-    lines = wrapper.wrap(self.Expand(text, namespace)) or ['']
+    lines = self._Wrap(
+        self.Expand(text, namespace), indent * self.TAB, (indent + 2) * self.TAB)
     for line in lines:
       self.Print(line)
 
@@ -193,9 +219,10 @@ class Helpfile(object):
     """Outputs a line to the file."""
     if not wide:
       assert len(line) <= self.WIDTH
-    if self.file is None:
+    if self._output is None:
       raise ValueError('Helpfile writer not yet given helpfile to write.')
-    self.file.write(line + end)
+    self._output.append(line)
+    self._output.append(end)
 
   def WriteRow(self):
     """Writes a horizontal divider row."""
@@ -209,14 +236,7 @@ class Helpfile(object):
     else:
       initial_indent = indent * self.TAB
       subsequent_indent = indent * self.TAB
-    wrapper = textwrap.TextWrapper(
-        width=self.WIDTH,
-        initial_indent=initial_indent,
-        subsequent_indent=subsequent_indent,
-        break_on_hyphens=False)
-    lines = wrapper.wrap(text)
-    # wrap returns empty list for ''. See http://bugs.python.org/issue15510.
-    lines = lines or ['']
+    lines = self._Wrap(text, initial_indent, subsequent_indent)
     lastlen = len(lines[-1])
     rightlen = len(right)
     assert rightlen <= self.WIDTH
@@ -230,6 +250,33 @@ class Helpfile(object):
     for line in lines:
       self.Print(line)
 
+  def _Wrap(self, text, initial_indent, subsequent_indent):
+    """Breaks text into indented lines that fit within WIDTH."""
+    if not text:
+      # wrap returns empty list for ''. See http://bugs.python.org/issue15510.
+      return ['']
+    if (len(initial_indent) + len(text) <= self.WIDTH
+        and not text[-1].isspace()
+        and not regex.wrapped_whitespace.search(text)):
+      # The line fits and has no whitespace that TextWrapper would expand,
+      # replace or drop, so wrapping would leave it as it is.
+      return [initial_indent + text]
+    wrapper = self._Wrapper(initial_indent, subsequent_indent)
+    return wrapper.wrap(text) or ['']
+
+  def _Wrapper(self, initial_indent, subsequent_indent):
+    """Gets a TextWrapper for the given indents, reused across lines."""
+    key = (initial_indent, subsequent_indent)
+    wrapper = self._wrappers.get(key)
+    if wrapper is None:
+      wrapper = textwrap.TextWrapper(
+          width=self.WIDTH,
+          initial_indent=initial_indent,
+          subsequent_indent=subsequent_indent,
+          break_on_hyphens=False)
+      self._wrappers[key] = wrapper
+    return wrapper
+
   def Slug(self, slug, sep='-'):
     return '{}{}{}'.format(self.module.name, sep, slug)
 
@@ -246,6 +293,9 @@ class Helpfile(object):
     return '[{}] is {} if omitted.'.format(arg, self.Expand(value, namespace))
 
   def Expand(self, text, namespace):
+    # Every inline directive starts with '@', and most text has none.
+    if '@' not in text:
+      return text
     def Expander(match):
       expanded = self.ExpandInline(*match.groups(), namespace=namespace)
       if expanded is None:
@@ -256,33 +306,54 @@ class Helpfile(object):
 
   def ExpandInline(self, inline, element, namespace):
     """Expands inline directives, like @function()."""
-    if inline == 'section':
-      return self.Link(self.Slug(element))
-    elif inline == 'function':
-      # If a user says @function(#Foo) then that points to in#this#file#Foo.
-      if element.startswith('#'):
-        element = (namespace or '') + element[1:]
-      return self.Link(self.module.LookupTag(vimdoc.FUNCTION, element))
-    elif inline == 'command':
-      return self.Link(self.module.LookupTag(vimdoc.COMMAND, element))
-    elif inline == 'flag':
-      return self.Link(
-          self.Slug(self.module.LookupTag(vimdoc.FLAG, element), ':'))
-    elif inline == 'setting':
-      return self.Link(self.module.LookupTag(vimdoc.SETTING, element))
-    elif inline == 'dict':
-      return self.Link(self.Slug(self.module.LookupTag(
-          vimdoc.DICTIONARY, element), '.'))
-    elif inline == 'plugin':
-      if element == 'author':
-        return self.module.plugin.author
-      elif element == 'stylized':
-        return self.module.plugin.stylization
-      elif element == 'name':
-        return self.module.name
-      elif element is None:
-        return self.module.plugin.stylization
-      else:
-        raise error.UnrecognizedInlineDirective(
-            '{} attribute in {}'.format(element, inline))
-    return None
+    expander = self._INLINE_EXPANDERS.get(inline)
+    if expander is None:
+      return None
+    return expander(self, element, namespace)
+
+  def _ExpandSection(self, element, namespace):
+    return self.Link(self.Slug(element))
+
+  def _ExpandFunction(self, element, namespace):
+    # If a user says @function(#Foo) then that points to in#this#file#Foo.
+    if element.startswith('#'):
+      element = (namespace or '') + element[1:]
+    return self.Link(self.module.LookupTag(vimdoc.FUNCTION, element))
+
+  def _ExpandCommand(self, element, namespace):
+    return self.Link(self.module.LookupTag(vimdoc.COMMAND, element))
+
+  def _ExpandFlag(self, element, namespace):
+    return self.Link(
+        self.Slug(self.module.LookupTag(vimdoc.FLAG, element), ':'))
+
+  def _ExpandSetting(self, element, namespace):
+    return self.Link(self.module.LookupTag(vimdoc.SETTING, element))
+
+  def _ExpandDict(self, element, namespace):
+    return self.Link(self.Slug(self.module.LookupTag(
+        vimdoc.DICTIONARY, element), '.'))
+
+  def _ExpandPlugin(self, element, namespace):
+    if element == 'author':
+      return self.module.plugin.author
+    elif element == 'stylized':
+      return self.module.plugin.stylization
+    elif element == 'name':
+      return self.module.name
+    elif element is None:
+      return self.module.plugin.stylization
+    else:
+      raise error.UnrecognizedInlineDirective(
+          '{} attribute in plugin'.format(element))
+
+  # Inline directive name to the method that expands it.
+  _INLINE_EXPANDERS = {
+      'section': _ExpandSection,
+      'function': _ExpandFunction,
+      'command': _ExpandCommand,
+      'flag': _ExpandFlag,
+      'setting': _ExpandSetting,
+      'dict': _ExpandDict,
+      'plugin': _ExpandPlugin,
+  }
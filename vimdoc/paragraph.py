@@ -1,5 +1,4 @@
 """Docline aggregation handlers."""
-import abc
 
 
 class Paragraph(object):
@@ -14,7 +13,7 @@ class Paragraph(object):
        which must not be joined with previous lines.
   """
 
-  __metaclass__ = abc.ABCMeta
+  __slots__ = ('open',)
 
   def __init__(self):
     self.open = True
@@ -22,7 +21,7 @@ class Paragraph(object):
   def Close(self):
     self.open = False
 
-  # It's an abstract base class, pylint.
+  # Subclasses use the text; the base class only checks the paragraph is open.
   # pylint:disable-msg=unused-argument
   def AddLine(self, text):
     if not self.open:
@@ -30,25 +29,35 @@ class Paragraph(object):
 
 
 class TextParagraph(Paragraph):
+  __slots__ = ('_parts',)
+
   def __init__(self):
     super(TextParagraph, self).__init__()
-    self.text = ''
+    # Lines are joined with spaces when the text is read, not as they arrive.
+    self._parts = []
+
+  @property
+  def text(self):
+    return ' '.join(self._parts)
 
   def AddLine(self, text):
     super(TextParagraph, self).AddLine(text)
-    if self.text:
-      self.text += ' ' + text
-    else:
-      self.text = text
+    # Empty lines only count once there's some text to add them to.
+    if self._parts or text:
+      self._parts.append(text)
 
 
 class BlankLine(Paragraph):
+  __slots__ = ()
+
   def __init__(self):
     super(BlankLine, self).__init__()
     self.Close()
 
 
 class CodeBlock(Paragraph):
+  __slots__ = ('lines',)
+
   def __init__(self):
     super(CodeBlock, self).__init__()
     self.lines = []
@@ -59,6 +68,8 @@ class CodeBlock(Paragraph):
 
 
 class DefaultLine(Paragraph):
+  __slots__ = ('arg', 'value')
+
   def __init__(self, arg, value):
     super(DefaultLine, self).__init__()
     self.open = False
@@ -67,6 +78,8 @@ class DefaultLine(Paragraph):
 
 
 class ListItem(TextParagraph):
+  __slots__ = ('leader', 'level')
+
   def __init__(self, leader='*', level=0):
     super(ListItem, self).__init__()
     self.leader = leader
@@ -74,6 +87,8 @@ class ListItem(TextParagraph):
 
 
 class ExceptionLine(Paragraph):
+  __slots__ = ('exception', 'description')
+
   def __init__(self, exception, description):
     super(ExceptionLine, self).__init__()
     self.open = False
@@ -82,6 +97,8 @@ class ExceptionLine(Paragraph):
 
 
 class SubHeaderLine(Paragraph):
+  __slots__ = ('name',)
+
   def __init__(self, name):
     super(SubHeaderLine, self).__init__()
     self.open = False
@@ -103,8 +120,23 @@ class Paragraphs(list):
     if not self.IsType(cls):
       self.append(cls(*args))
 
+  def Current(self):
+    """Returns the open paragraph, or None if there isn't one."""
+    if self and self[-1].open:
+      return self[-1]
+    return None
+
   def IsType(self, cls):
-    return self and self[-1].open and isinstance(self[-1], cls)
+    return isinstance(self.Current(), cls)
+
+  def AddLineAs(self, cls, text, *args):
+    """Adds a line, first starting a new paragraph of type cls if needed.
+
+    This is SetType(cls, *args) followed by AddLine(text), in one call.
+    """
+    if not (self and self[-1].open and isinstance(self[-1], cls)):
+      self.append(cls(*args))
+    self[-1].AddLine(text)
 
   def AddLine(self, *args):
     # Lines are text by default.
@@ -6,17 +6,28 @@ from vimdoc import error
 from vimdoc import regex
 
 
+# The leaders below are plain prefixes after any indentation, so they're found
+# with string methods rather than the equivalent patterns in regex.
 def IsComment(line):
-  return regex.comment_leader.match(line)
+  return line.lstrip().startswith('"')
 
 
 def IsContinuation(line):
-  return regex.line_continuation.match(line)
+  return line.lstrip().startswith('\\')
 
 
 def StripContinuator(line):
-  assert regex.line_continuation.match(line)
-  return regex.line_continuation.sub('', line)
+  stripped = line.lstrip()
+  assert stripped.startswith('\\')
+  return stripped[1:]
+
+
+def StripCommentLeader(line):
+  """Removes the comment leader from the start of a line, if it has one."""
+  stripped = line.lstrip()
+  if not stripped.startswith('"'):
+    return line
+  return stripped[2:] if stripped.startswith('" ') else stripped[1:]
 
 
 def EnumerateStripNewlinesAndJoinContinuations(lines):
@@ -30,29 +41,35 @@ def EnumerateStripNewlinesAndJoinContinuations(lines):
   Yields:
     Each preprocessed line.
   """
-  lineno, cached = (None, None)
+  # The pieces of the current line, joined once the line is complete.
+  lineno, parts = (None, None)
   for i, line in enumerate(lines):
     line = line.rstrip('\n')
     if IsContinuation(line):
-      if cached is None:
+      if parts is None:
         raise error.CannotContinue('No preceding line.', i)
-      elif IsComment(cached) and not IsComment(line):
+      elif IsComment(parts[0]) and not IsComment(line):
         raise error.CannotContinue('No comment to continue.', i)
+      elif parts[0].strip():
+        parts.append(StripContinuator(line))
       else:
-        cached += StripContinuator(line)
+        # Until the line has some text, whether it's a comment depends on what
+        # gets continued onto it, so keep that in the first piece.
+        parts[0] += StripContinuator(line)
       continue
-    if cached is not None:
-      yield lineno, cached
-    lineno, cached = (i, line)
-  if cached is not None:
-    yield lineno, cached
+    if parts is not None:
+      yield lineno, ''.join(parts)
+    lineno, parts = (i, [line])
+  if parts is not None:
+    yield lineno, ''.join(parts)
 
 
 def EnumerateParsedLines(lines):
   vimdoc_mode = False
   for i, line in EnumerateStripNewlinesAndJoinContinuations(lines):
     if not vimdoc_mode:
-      if regex.vimdoc_leader.match(line):
+      stripped = line.lstrip()
+      if stripped.startswith('""'):
         vimdoc_mode = True
         # There's no need to yield the blank line if it's an empty starter line.
         # For example, in:
@@ -60,10 +77,10 @@ def EnumerateParsedLines(lines):
         # " @usage whatever
         # " description
         # There's no need to yield the first docline as a blank.
-        if not regex.empty_vimdoc_leader.match(line):
+        if stripped != '""':
           # A starter line starts with two comment leaders.
           # If we strip one of them it's a normal comment line.
-          yield i, ParseCommentLine(regex.comment_leader.sub('', line))
+          yield i, ParseCommentLine(StripCommentLeader(line))
     elif IsComment(line):
       yield i, ParseCommentLine(line)
     else:
@@ -73,32 +90,43 @@ def EnumerateParsedLines(lines):
 
 def ParseCodeLine(line):
   """Parses one line of code and creates the appropriate CodeLine."""
-  if regex.blank_code_line.match(line):
+  # Each kind of line we recognize starts with its own keyword, so only the
+  # pattern for that keyword can match.
+  stripped = line.lstrip()
+  if not stripped:
     return codeline.Blank()
-  fmatch = regex.function_line.match(line)
-  if fmatch:
-    namespace, name, args = fmatch.groups()
-    return codeline.Function(name, namespace, regex.function_arg.findall(args))
-  cmatch = regex.command_line.match(line)
-  if cmatch:
-    args, name = cmatch.groups()
-    flags = {
-        'bang': '-bang' in args,
-        'range': '-range' in args,
-        'count': '-count' in args,
-        'register': '-register' in args,
-        'buffer': '-buffer' in args,
-        'bar': '-bar' in args,
-    }
-    return codeline.Command(name, **flags)
-  smatch = regex.setting_line.match(line)
-  if smatch:
-    name, = smatch.groups()
-    return codeline.Setting('g:' + name)
-  flagmatch = regex.flag_line.match(line)
-  if flagmatch:
-    a, b, default = flagmatch.groups()
-    return codeline.Flag(a or b, default)
+  if stripped.startswith('fu'):
+    fmatch = regex.function_line.match(line)
+    if fmatch:
+      namespace, name, args = fmatch.groups()
+      return codeline.Function(
+          name, namespace, regex.function_arg.findall(args))
+  elif stripped.startswith('com'):
+    cmatch = regex.command_line.match(line)
+    if cmatch:
+      args, name = cmatch.groups()
+      # Attributes like -range=% and -count=3 carry a value after the '='.
+      attributes = set(arg.split('=', 1)[0] for arg in args.split())
+      flags = {
+          'bang': '-bang' in attributes,
+          'range': '-range' in attributes,
+          'count': '-count' in attributes,
+          'register': '-register' in attributes,
+          'buffer': '-buffer' in attributes,
+          'bar': '-bar' in attributes,
+      }
+      return codeline.Command(name, **flags)
+  elif stripped.startswith('let') and 'g:' in line:
+    # Only global variables are settings; most lets are for locals.
+    smatch = regex.setting_line.match(line)
+    if smatch:
+      return codeline.Setting('g:' + smatch.group(1))
+  elif stripped.startswith('cal') and '.Flag(' in line:
+    # The pattern backtracks through the line to find .Flag(, so look first.
+    flagmatch = regex.flag_line.match(line)
+    if flagmatch:
+      a, b, default = flagmatch.groups()
+      return codeline.Flag(a or b, default)
   return codeline.Unrecognized(line)
 
 
@@ -107,16 +135,17 @@ def ParseCommentLine(line):
   block = regex.block_directive.match(line)
   if block:
     return ParseBlockDirective(*block.groups())
-  return docline.Text(regex.comment_leader.sub('', line))
+  return docline.Text(StripCommentLeader(line))
 
 
 def ParseBlockDirective(name, rest):
-  if name in docline.BLOCK_DIRECTIVES:
-    try:
-      return docline.BLOCK_DIRECTIVES[name](rest)
-    except ValueError:
-      raise error.InvalidBlockArgs(rest)
-  raise error.UnrecognizedBlockDirective(name)
+  directive = docline.BLOCK_DIRECTIVES.get(name)
+  if directive is None:
+    raise error.UnrecognizedBlockDirective(name)
+  try:
+    return directive(rest)
+  except ValueError:
+    raise error.InvalidBlockArgs(rest)
 
 
 def ParseBlocks(lines, filename):
@@ -15,6 +15,10 @@ True
 >>> line_continuation.match(r' \\  foo') is not None
 True
 
+>>> any_line_continuation.search('foo\\nbar\\n')
+>>> any_line_continuation.search('foo\\n  \\\\ bar\\n') is not None
+True
+
 >>> blank_comment_line.match('')
 >>> blank_comment_line.match('" foo')
 >>> blank_comment_line.match('"') is not None
@@ -166,9 +170,20 @@ True
 ...     'foo @function(bar) baz @link(quux) @this')
 'foo [bar] baz [quux] [None]'
 
+>>> required_arg.findall('{foo} [bar] x{baz} {qux...}')
+['foo', 'qux...']
+>>> optional_arg.findall('{foo} [bar] x[baz] [qux...]')
+['bar', 'qux...']
+>>> required_or_optional_arg.findall('{foo} [bar] x{baz} {qux...}')
+[('foo', ''), ('', 'bar'), ('qux...', '')]
+
 >>> function_arg.findall('foo, bar, baz, ...')
 ['foo', 'bar', 'baz', '...']
 
+>>> required_hole.search('foo{} []bar')
+>>> [m.lastindex for m in usage_hole.finditer('<>() <|> {||} [|]')]
+[1, 2, 3, 4]
+
 >>> bad_separator.search('foo, bar, baz')
 >>> bad_separator.search('foo bar baz')
 >>> bad_separator.search('foo, , bar, baz') is not None
@@ -207,8 +222,11 @@ vimdoc_leader = re.compile(r'^\s*"" ?')
 empty_vimdoc_leader = re.compile(r'^\s*""$')
 comment_leader = re.compile(r'^\s*" ?')
 line_continuation = re.compile(r'^\s*\\')
+any_line_continuation = re.compile(r'^[ \t]*\\', re.MULTILINE)
 blank_comment_line = re.compile(r'^\s*"\s*$')
 blank_code_line = re.compile(r'^\s*$')
+# Whitespace other than spaces, which TextWrapper expands or replaces.
+wrapped_whitespace = re.compile(r'[\t\n\x0b\x0c\r]')
 block_directive = re.compile(r'^\s*"\s*@([a-zA-Z_][a-zA-Z0-9_]*)(?:\s+|$)(.*)')
 section_args = re.compile(r"""
   ^
@@ -359,15 +377,22 @@ flag_line = re.compile(r"""
 """, re.VERBOSE)
 inline_directive = re.compile(r'@([a-zA-Z_][a-zA-Z0-9_]*)(?:\(([^\s)]+)\))?')
 
-name_hole = re.compile(r'<>')
 arg_hole = re.compile(r'{\]')
 required_hole = _DelimitedRegex(r'{}')
 optional_hole = _DelimitedRegex(r'\[\]')
+usage_hole = re.compile(r"""
+    # GROUP 1: The name hole.
+    (<>)
+  | # GROUP 2, 3 or 4: An escaped name, required or optional hole.
+    <\|(\|*)>
+  | {\|(\|*)}
+  | \[\|(\|*)\]
+""", re.VERBOSE)
 required_arg = _DelimitedRegex(r'{([a-zA-Z_][a-zA-Z0-9_]*(?:\.\.\.)?)}')
 optional_arg = _DelimitedRegex(r'\[([a-zA-Z_][a-zA-Z0-9_]*(?:\.\.\.)?)\]')
-namehole_escape = re.compile(r'<\|(\|*)>')
-requiredhole_escape = re.compile(r'{\|(\|*)}')
-optionalhole_escape = re.compile(r'\[\|(\|*)\]')
+required_or_optional_arg = _DelimitedRegex(
+    r'{([a-zA-Z_][a-zA-Z0-9_]*(?:\.\.\.)?)}'
+    r'|\[([a-zA-Z_][a-zA-Z0-9_]*(?:\.\.\.)?)\]')
 bad_separator = re.compile(r"""
   (?:
     # Extra comma-spaces